@@ -14,21 +14,44 @@ Usage:
 from __future__ import annotations
 
 import argparse
+import collections
+import contextlib
+import ctypes
+import functools
 import json
 import os
-import queue
 import re
+import select
+import selectors
+import socket
+import struct
 import threading
 import time
-from dataclasses import asdict, dataclass
+from dataclasses import dataclass, field
 from http import HTTPStatus
 from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
-from typing import Optional
+from typing import AnyStr, Callable, Optional
 
 
-ANTI_TAMPERING_WARN_RE = re.compile(
-    r"""
+@functools.lru_cache(maxsize=128)
+def _compile(pattern: AnyStr, flags: int = 0) -> "re.Pattern[AnyStr]":
+    """
+    Compile a pattern once. Every regex in this module goes through here, so
+    patterns built at runtime never depend on re's own (evictable) cache.
+    Hot paths call the returned pattern's .match/.search directly.
+    """
+    return re.compile(pattern, flags)
+
+
+# Lines are matched as raw bytes (the log format is ASCII); only the fields
+# of lines that turn into events are ever decoded.
+
+# Literal every anti-tampering line contains; used as a cheap prefilter.
+ANTI_TAMPERING_MARKER = b"[ANTI_TAMPERING_"
+
+ANTI_TAMPERING_WARN_RE = _compile(
+    rb"""
     ^\[(?P<ts>[^\]]+)\]\s*-\s*
     \[(?P<tag>ANTI_TAMPERING_[A-Z_]+)\]\s*
     (?P<msg>.*)$
@@ -38,8 +61,8 @@ ANTI_TAMPERING_WARN_RE = re.compile(
 
 # Special-case parser for the common mismatch warning:
 # "... Hash mismatch for file <path> (size=..., verify_fd=...); Stored hash: ...; Computed hash: ..."
-MISMATCH_RE = re.compile(
-    r"""
+MISMATCH_RE = _compile(
+    rb"""
     Hash\ mismatch\ for\ file\ (?P<path>.+?)\s*
     \(size=(?P<size>\d+),\s*verify_fd=(?P<verify_fd>-?\d+)\);\s*
     Stored\ hash:\s*(?P<stored>[0-9a-fA-F]+);\s*
@@ -48,8 +71,21 @@ MISMATCH_RE = re.compile(
     re.VERBOSE,
 )
 
+# "... Hash file <hash_path> does not exist for file <path>. ..."
+HASH_MISSING_RE = _compile(
+    rb"Hash file (?P<hash_path>\S+) does not exist for file (?P<path>[^.]+)\."
+)
 
-@dataclass(frozen=True)
+# "... Failed to open verification fd for file <path>"
+FAILED_FD_RE = _compile(rb"Failed to open verification fd for file (?P<path>.+)$")
+
+
+# C-accelerated JSON string encoder (same one json.dumps uses with
+# ensure_ascii=False); returns the quoted, escaped literal.
+_encode_str = json.encoder.encode_basestring
+
+
+@dataclass(slots=True)
 class AntiTamperingEvent:
     ts: str
     tag: str
@@ -63,160 +99,563 @@ class AntiTamperingEvent:
     computed: Optional[str] = None
     raw: Optional[str] = None
 
+    def as_json(self) -> bytes:
+        """
+        Serialize the event to UTF-8 JSON.
+
+        The shape is fixed, so build the object directly instead of going
+        through asdict() + json.dumps(). Fields that are None are left out
+        (the dashboard treats missing and null alike), which keeps the common
+        non-mismatch events small on the wire.
+        """
+        e = _encode_str
+        out = [
+            f'{{"ts": {e(self.ts)}, "tag": {e(self.tag)}, '
+            f'"severity": {e(self.severity)}, "message": {e(self.message)}'
+        ]
+        if self.path is not None:
+            out.append(f', "path": {e(self.path)}')
+        if self.hash_path is not None:
+            out.append(f', "hash_path": {e(self.hash_path)}')
+        if self.size is not None:
+            out.append(f', "size": {self.size}')
+        if self.verify_fd is not None:
+            out.append(f', "verify_fd": {self.verify_fd}')
+        if self.stored is not None:
+            out.append(f', "stored": {e(self.stored)}')
+        if self.computed is not None:
+            out.append(f', "computed": {e(self.computed)}')
+        if self.raw is not None:
+            out.append(f', "raw": {e(self.raw)}')
+        out.append("}")
+        return "".join(out).encode("utf-8")
+
+
+# SSE framing for a warn event; payloads are framed once in the tailer and
+# shared by every subscriber.
+SSE_PREFIX = b"event: warn\ndata: "
+SSE_SUFFIX = b"\n\n"
+# SSE comment lines: sent when a stream opens, and as the keep-alive ping.
+SSE_OPEN = b": ok\n\n"
+SSE_PING = b": ping\n\n"
+
+
+# Events are published in batches to amortize the per-subscriber wakeup
+# (and the per-write flush in the SSE handler) across bursts.
+BATCH_MAX_EVENTS = 32
+BATCH_MAX_DELAY_S = 0.05
+
+# The tailer reads appended data in chunks this size and splits lines itself.
+READ_CHUNK_SIZE = 64 * 1024
+
+
+# Idle SSE streams get a keep-alive comment this often.
+PING_INTERVAL_S = 15.0
+
+
+@dataclass(eq=False)
+class Subscriber:
+    # Bounded ring of pending batches; appending to a full deque silently
+    # drops the oldest entry, and deque.append/popleft are atomic in CPython.
+    dq: "collections.deque[list[bytes]]" = field(
+        default_factory=lambda: collections.deque(maxlen=64)
+    )
+    # Called after every publish; must be cheap and must not block.
+    notify: Callable[[], None] = lambda: None
+
 
 class EventBus:
     def __init__(self) -> None:
-        self._subscribers: set["queue.Queue[str]"] = set()
+        # Copy-on-write snapshot so publish() never has to take the lock.
+        self._subscribers: tuple[Subscriber, ...] = ()
         self._lock = threading.Lock()
 
-    def subscribe(self) -> "queue.Queue[str]":
-        q: "queue.Queue[str]" = queue.Queue(maxsize=500)
+    def subscribe(self, notify: Callable[[], None]) -> Subscriber:
+        sub = Subscriber(notify=notify)
         with self._lock:
-            self._subscribers.add(q)
-        return q
+            self._subscribers = self._subscribers + (sub,)
+        return sub
 
-    def unsubscribe(self, q: "queue.Queue[str]") -> None:
+    def unsubscribe(self, sub: Subscriber) -> None:
         with self._lock:
-            self._subscribers.discard(q)
+            self._subscribers = tuple(s for s in self._subscribers if s is not sub)
 
-    def publish(self, payload: str) -> None:
-        with self._lock:
-            subs = list(self._subscribers)
-        for q in subs:
-            try:
-                q.put_nowait(payload)
-            except queue.Full:
-                # Drop oldest by clearing a bit, then try again.
+    def publish(self, batch: list[bytes]) -> None:
+        for sub in self._subscribers:
+            sub.dq.append(batch)
+            sub.notify()
+
+
+@dataclass(eq=False)
+class SSEClient:
+    sock: socket.socket
+    fd: int  # sock.fileno() at registration; fileno() is -1 once closed
+    # Framed batches not yet handed to the kernel; drop-oldest like the bus.
+    pending: "collections.deque[bytes]" = field(
+        default_factory=lambda: collections.deque(maxlen=64)
+    )
+    out: memoryview = memoryview(b"")  # partially sent head of `pending`
+    events: int = selectors.EVENT_READ
+    last_write: float = field(default_factory=time.monotonic)
+
+
+class SSEFanout:
+    """
+    Push events to every /events client from a single thread:
+    - Handlers send the SSE headers, then hand their socket over via add()
+    - The bus wakes the thread through a self-pipe when a batch is published
+    - Sockets are non-blocking; a slow client keeps its unsent bytes and is
+      only polled for writability while it has some
+    - Disconnects are noticed by reading EOF or by a failed send
+    """
+
+    def __init__(self, bus: EventBus) -> None:
+        self._sel = selectors.DefaultSelector()
+        self._clients: dict[int, SSEClient] = {}
+        self._incoming: "collections.deque[socket.socket]" = collections.deque()
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        os.set_blocking(self._wake_w, False)
+        self._sel.register(self._wake_r, selectors.EVENT_READ)
+        self._sub = bus.subscribe(self._wakeup)
+
+    def _wakeup(self) -> None:
+        try:
+            os.write(self._wake_w, b"\0")
+        except BlockingIOError:
+            # Pipe full: a wakeup is already pending
+            pass
+
+    def add(self, sock: socket.socket) -> None:
+        """Take ownership of an SSE connection whose headers are sent."""
+        self._incoming.append(sock)
+        self._wakeup()
+
+    def run(self) -> None:
+        while True:
+            # Only idle clients get pings; clients with unsent data are woken
+            # by EVENT_WRITE instead, and must not pull the deadline forward.
+            timeout = None
+            idle_since = [
+                c.last_write
+                for c in self._clients.values()
+                if not c.out and not c.pending
+            ]
+            if idle_since:
+                next_ping = min(idle_since) + PING_INTERVAL_S
+                timeout = max(0.0, next_ping - time.monotonic())
+
+            for key, mask in self._sel.select(timeout):
+                if key.fileobj == self._wake_r:
+                    self._drain_wakeups()
+                    continue
+                client = key.data
+                if self._clients.get(key.fd) is not client:
+                    # Dropped earlier in this round (its fd may even have
+                    # been reused by a client registered since)
+                    continue
                 try:
-                    _ = q.get_nowait()
-                    q.put_nowait(payload)
+                    if mask & selectors.EVENT_READ and not self._check_alive(client):
+                        continue
+                    if mask & selectors.EVENT_WRITE:
+                        self._flush(client)
                 except Exception:
-                    pass
+                    # One misbehaving client must not end the fan-out thread
+                    self._drop(client)
+
+            now = time.monotonic()
+            for client in list(self._clients.values()):
+                idle = not client.out and not client.pending
+                if idle and now - client.last_write >= PING_INTERVAL_S:
+                    # keep-alive ping
+                    client.pending.append(SSE_PING)
+                    self._flush_or_drop(client)
+
+    def _drain_wakeups(self) -> None:
+        try:
+            while os.read(self._wake_r, 4096):
+                pass
+        except BlockingIOError:
+            pass
 
+        while self._incoming:
+            sock = self._incoming.popleft()
+            try:
+                sock.setblocking(False)
+                client = SSEClient(sock=sock, fd=sock.fileno())
+                self._sel.register(sock, client.events, client)
+            except (OSError, ValueError):
+                # Gone before we got to it
+                sock.close()
+                continue
+            self._clients[client.fd] = client
+
+        frames = []
+        while self._sub.dq:
+            frames.extend(self._sub.dq.popleft())
+        if frames:
+            data = b"".join(frames)
+            for client in list(self._clients.values()):
+                client.pending.append(data)
+                self._flush_or_drop(client)
+
+    def _check_alive(self, client: SSEClient) -> bool:
+        # Browsers send nothing after the request; readable means EOF/reset.
+        try:
+            if client.sock.recv(4096):
+                return True
+        except BlockingIOError:
+            return True
+        except OSError:
+            pass
+        self._drop(client)
+        return False
 
-def parse_line(line: str) -> Optional[AntiTamperingEvent]:
-    m = ANTI_TAMPERING_WARN_RE.match(line.strip())
-    if not m:
-        return None
+    def _flush(self, client: SSEClient) -> None:
+        try:
+            while True:
+                if not client.out:
+                    if not client.pending:
+                        break
+                    client.out = memoryview(client.pending.popleft())
+                sent = client.sock.send(client.out)
+                client.out = client.out[sent:]
+                client.last_write = time.monotonic()
+        except BlockingIOError:
+            pass
+        except OSError:
+            self._drop(client)
+            return
 
-    ts = m.group("ts")
-    tag = m.group("tag")
-    msg = m.group("msg").strip()
+        events = selectors.EVENT_READ
+        if client.out or client.pending:
+            events |= selectors.EVENT_WRITE
+        if events != client.events:
+            client.events = events
+            self._sel.modify(client.sock, events, client)
 
+    def _flush_or_drop(self, client: SSEClient) -> None:
+        try:
+            self._flush(client)
+        except Exception:
+            self._drop(client)
+
+    def _drop(self, client: SSEClient) -> None:
+        # Idempotent: a client can fail more than once in the same round
+        if self._clients.get(client.fd) is not client:
+            return
+        del self._clients[client.fd]
+        with contextlib.suppress(KeyError, ValueError, OSError):
+            self._sel.unregister(client.sock)
+        client.sock.close()
+
+
+def _text(b: bytes) -> str:
+    return b.decode("utf-8", errors="replace")
+
+
+def _parse_generic(
+    ts: bytes, tag: bytes, msg: bytes, raw: bytes
+) -> AntiTamperingEvent:
     # Default: show as yellow warning
-    severity = "warning"
+    return AntiTamperingEvent(
+        ts=_text(ts),
+        tag=_text(tag),
+        severity="warning",
+        message=_text(msg),
+        raw=_text(raw),
+    )
+
 
+def _parse_open(ts: bytes, tag: bytes, msg: bytes, raw: bytes) -> AntiTamperingEvent:
     mm = MISMATCH_RE.search(msg)
     if mm:
-        severity = "danger"
+        path, size, verify_fd, stored, computed = mm.group(
+            "path", "size", "verify_fd", "stored", "computed"
+        )
+        return AntiTamperingEvent(
+            ts=_text(ts),
+            tag=_text(tag),
+            severity="danger",
+            message=_text(msg),
+            path=_text(path),
+            size=int(size),
+            verify_fd=int(verify_fd),
+            stored=_text(stored),
+            computed=_text(computed),
+            raw=_text(raw),
+        )
+
+    mm = HASH_MISSING_RE.search(msg)
+    if mm:
         return AntiTamperingEvent(
-            ts=ts,
-            tag=tag,
-            severity=severity,
-            message=msg,
-            path=mm.group("path"),
-            size=int(mm.group("size")),
-            verify_fd=int(mm.group("verify_fd")),
-            stored=mm.group("stored"),
-            computed=mm.group("computed"),
-            raw=line.rstrip("\n"),
+            ts=_text(ts),
+            tag=_text(tag),
+            severity="warning",
+            message=_text(msg),
+            path=_text(mm.group("path").strip()),
+            hash_path=_text(mm.group("hash_path")),
+            raw=_text(raw),
         )
 
-    # Parse: "Hash file <hash_path> does not exist for file <path> ..."
-    if "Hash file " in msg and " does not exist for file " in msg:
-        try:
-            # Keep it simple and robust: split once
-            part = msg.split("Hash file ", 1)[1]
-            hash_path, rest = part.split(" does not exist for file ", 1)
-            file_path = rest.split(".", 1)[0].strip()
-            return AntiTamperingEvent(
-                ts=ts,
-                tag=tag,
-                severity=severity,
-                message=msg,
-                path=file_path,
-                hash_path=hash_path.strip(),
-                raw=line.rstrip("\n"),
-            )
-        except Exception:
-            pass
+    mm = FAILED_FD_RE.search(msg)
+    if mm:
+        return AntiTamperingEvent(
+            ts=_text(ts),
+            tag=_text(tag),
+            severity="warning",
+            message=_text(msg),
+            path=_text(mm.group("path").strip()),
+            raw=_text(raw),
+        )
+
+    return _parse_generic(ts, tag, msg, raw)
+
+
+# Per-tag parsers. Only ANTI_TAMPERING_OPEN emits the structured messages
+# above (see layers/anti_tampering/anti_tampering.c); every other tag carries
+# a free-form message and goes straight to _parse_generic.
+TagParser = Callable[[bytes, bytes, bytes, bytes], AntiTamperingEvent]
+TAG_PARSERS: dict[bytes, TagParser] = {
+    b"ANTI_TAMPERING_OPEN": _parse_open,
+}
+
+
+def parse_line(line: bytes) -> Optional[AntiTamperingEvent]:
+    # Most lines in a busy warn.log are not ours; reject them with a plain
+    # substring scan before paying for the regex engine.
+    if ANTI_TAMPERING_MARKER not in line:
+        return None
+
+    m = ANTI_TAMPERING_WARN_RE.match(line.strip())
+    if not m:
+        return None
+
+    # Fetch all groups in one call rather than one lookup per field.
+    ts, tag, msg = m.group("ts", "tag", "msg")
+    parse = TAG_PARSERS.get(tag, _parse_generic)
+    return parse(ts, tag, msg.strip(), line.rstrip(b"\r\n"))
+
+
+# inotify(7) constants; not exposed by the stdlib.
+IN_MODIFY = 0x00000002
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+INOTIFY_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len
+WATCH_MASK = (
+    IN_MODIFY
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+    | IN_MOVE_SELF
+)
+
+
+class FileWatcher:
+    """
+    Block until a file changes:
+    - On Linux, watch the parent directory with inotify so appends, rotation
+      and re-creation all wake us up, and idle periods cost no wakeups
+    - If the directory is missing, deleted or moved away, poll until it can
+      be watched again
+    - Elsewhere (or if inotify is unavailable), fall back to polling
+    """
 
-    # Parse: "Failed to open verification fd for file <path>"
-    if "Failed to open verification fd for file " in msg:
+    def __init__(self, path: Path, poll_interval: float = 0.25) -> None:
+        self._name = os.fsencode(path.name)
+        self._dir = os.fsencode(path.parent)
+        self._poll_interval = poll_interval
+        self._libc = None
+        self._fd = -1
+        self._wd = -1
         try:
-            file_path = msg.split("Failed to open verification fd for file ", 1)[1].strip()
-            return AntiTamperingEvent(
-                ts=ts,
-                tag=tag,
-                severity=severity,
-                message=msg,
-                path=file_path,
-                raw=line.rstrip("\n"),
-            )
-        except Exception:
-            pass
+            libc = ctypes.CDLL(None, use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if fd < 0:
+                return
+            self._libc = libc
+            self._fd = fd
+        except (AttributeError, OSError):
+            # No inotify on this platform; keep polling
+            return
+        self._add_watch()
 
-    return AntiTamperingEvent(
-        ts=ts, tag=tag, severity=severity, message=msg, raw=line.rstrip("\n")
-    )
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+            self._wd = -1
+
+    def wait(self, timeout: float) -> None:
+        if self._fd < 0 or (self._wd < 0 and not self._add_watch()):
+            time.sleep(self._poll_interval)
+            return
+
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            ready, _, _ = select.select([self._fd], [], [], remaining)
+            if not ready or self._drain():
+                return
+
+    def _add_watch(self) -> bool:
+        """(Re-)watch the parent directory; False if it can't be watched yet."""
+        self._wd = self._libc.inotify_add_watch(self._fd, self._dir, WATCH_MASK)
+        return self._wd >= 0
+
+    def _drain(self) -> bool:
+        """Consume pending events; True if any of them concern our file."""
+        hit = False
+        while True:
+            try:
+                buf = os.read(self._fd, 4096)
+            except BlockingIOError:
+                return hit
+            off = 0
+            while off < len(buf):
+                wd, mask, _, length = INOTIFY_EVENT.unpack_from(buf, off)
+                off += INOTIFY_EVENT.size
+                name = buf[off : off + length].rstrip(b"\0")
+                off += length
+                if name == self._name or mask & IN_Q_OVERFLOW:
+                    hit = True
+                elif wd == self._wd and mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                    # The watch no longer covers our path; drop it so the next
+                    # wait() re-adds it on whatever directory is there now
+                    self._libc.inotify_rm_watch(self._fd, wd)
+                    self._wd = -1
+                    hit = True
+                elif wd == self._wd and mask & IN_IGNORED:
+                    self._wd = -1
+                    hit = True
+
+
+def publish_new_lines(
+    fd: int, pos: int, bus: EventBus, stop_evt: threading.Event
+) -> int:
+    """
+    Parse and publish every complete line from `pos` onwards; return the
+    offset just past the last line consumed.
+    """
+    batch: list[bytes] = []
+    batch_start = time.monotonic()
+    while not stop_evt.is_set():
+        chunk = os.pread(fd, READ_CHUNK_SIZE, pos)
+        # Only consume complete lines; a line still being written
+        # is picked up on the next wake once it is terminated.
+        end = chunk.rfind(b"\n") + 1
+        if end:
+            lines = chunk.split(b"\n")
+            lines.pop()  # empty, or the unterminated tail
+        elif len(chunk) < READ_CHUNK_SIZE:
+            break
+        else:
+            # Over-long line: don't stall on it forever
+            end = len(chunk)
+            lines = [chunk]
+        pos += end
+        for raw_line in lines:
+            ev = parse_line(raw_line)
+            if not ev:
+                continue
+            if not batch:
+                batch_start = time.monotonic()
+            batch.append(b"".join((SSE_PREFIX, ev.as_json(), SSE_SUFFIX)))
+            if (
+                len(batch) >= BATCH_MAX_EVENTS
+                or time.monotonic() - batch_start >= BATCH_MAX_DELAY_S
+            ):
+                bus.publish(batch)
+                batch = []
+    # Flush whatever is left once we've caught up with the file
+    if batch:
+        bus.publish(batch)
+    return pos
 
 
 def tail_file(path: Path, bus: EventBus, stop_evt: threading.Event) -> None:
     """
     Tail a file, handling truncation/rotation in a simple way:
     - If file shrinks, seek back to 0
+    - If file is replaced, reopen it and start from 0
     - If file disappears, keep retrying
+    The file stays open between reads; in between, sleep until it changes
+    (see FileWatcher).
     """
     pos = 0
-    last_inode = None
+    f = None
+    watcher = FileWatcher(path)
 
     while not stop_evt.is_set():
         try:
             st = path.stat()
-            inode = (st.st_dev, st.st_ino)
-            if last_inode != inode:
+            if f is None or not os.path.samestat(st, os.fstat(f.fileno())):
                 # Rotation or new file: reset
-                last_inode = inode
+                if f is not None:
+                    f.close()
+                    f = None
+                f = path.open("rb")
+                st = os.fstat(f.fileno())
                 pos = 0
 
             # If truncated, reset
             if st.st_size < pos:
                 pos = 0
 
-            with path.open("r", encoding="utf-8", errors="replace") as f:
-                f.seek(pos)
-                while not stop_evt.is_set():
-                    line = f.readline()
-                    if not line:
-                        pos = f.tell()
-                        break
-                    ev = parse_line(line)
-                    if ev:
-                        bus.publish(json.dumps(asdict(ev), ensure_ascii=False))
+            if st.st_size > pos:
+                pos = publish_new_lines(f.fileno(), pos, bus, stop_evt)
         except FileNotFoundError:
-            last_inode = None
+            if f is not None:
+                f.close()
+                f = None
             pos = 0
         except Exception:
             # Don't crash the tailer on unexpected parse/IO errors
             pass
 
-        time.sleep(0.25)
+        watcher.wait(timeout=15)
+
+    if f is not None:
+        f.close()
+    watcher.close()
 
 
 class Handler(BaseHTTPRequestHandler):
     server_version = "AntiTamperingDashboard/0.1"
 
     def _send(self, code: int, content_type: str, body: bytes) -> None:
-        self.send_response(code)
-        self.send_header("Content-Type", content_type)
-        self.send_header("Content-Length", str(len(body)))
-        self.send_header("Cache-Control", "no-store")
-        self.end_headers()
-        self.wfile.write(body)
+        # Cork the socket so headers and body go out together instead of as
+        # a separate header segment followed by the body (Linux only).
+        cork = hasattr(socket, "TCP_CORK")
+        if cork:
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_CORK, 1)
+        try:
+            self.send_response(code)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Cache-Control", "no-store")
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            if cork:
+                with contextlib.suppress(OSError):
+                    self.connection.setsockopt(
+                        socket.IPPROTO_TCP, socket.TCP_CORK, 0
+                    )
 
     def do_GET(self) -> None:  # noqa: N802
         if self.path == "/" or self.path.startswith("/index.html"):
-            html = (Path(__file__).parent / "index.html").read_bytes()
+            html = self.server.index_html  # type: ignore[attr-defined]
             self._send(HTTPStatus.OK, "text/html; charset=utf-8", html)
             return
 
@@ -227,30 +666,22 @@ class Handler(BaseHTTPRequestHandler):
             self.send_header("Connection", "keep-alive")
             self.end_headers()
 
-            q = self.server.bus.subscribe()  # type: ignore[attr-defined]
-            try:
-                # Initial comment to open the stream quickly
-                self.wfile.write(b": ok\n\n")
-                self.wfile.flush()
-
-                while True:
-                    try:
-                        payload = q.get(timeout=15)
-                        data = f"event: warn\ndata: {payload}\n\n".encode("utf-8")
-                        self.wfile.write(data)
-                        self.wfile.flush()
-                    except queue.Empty:
-                        # keep-alive ping
-                        self.wfile.write(b": ping\n\n")
-                        self.wfile.flush()
-            except (BrokenPipeError, ConnectionResetError):
-                pass
-            finally:
-                self.server.bus.unsubscribe(q)  # type: ignore[attr-defined]
+            # Initial comment to open the stream quickly
+            self.wfile.write(SSE_OPEN)
+            self.wfile.flush()
+
+            # From here on the fan-out thread owns the socket; this handler
+            # thread returns instead of blocking for the stream's lifetime.
+            self.server.detach(self.connection)  # type: ignore[attr-defined]
+            self.close_connection = True
             return
 
         if self.path.startswith("/health"):
-            self._send(HTTPStatus.OK, "application/json", b'{"ok":true}')
+            body = json.dumps(
+                {"ok": True, "regex_cache": _compile.cache_info()._asdict()},
+                separators=(",", ":"),
+            ).encode("utf-8")
+            self._send(HTTPStatus.OK, "application/json", body)
             return
 
         self._send(HTTPStatus.NOT_FOUND, "text/plain; charset=utf-8", b"Not found")
@@ -260,6 +691,27 @@ class Handler(BaseHTTPRequestHandler):
         return
 
 
+class DashboardServer(ThreadingHTTPServer):
+    def __init__(self, server_address: tuple[str, int], bus: EventBus) -> None:
+        super().__init__(server_address, Handler)
+        self.bus = bus
+        self.fanout = SSEFanout(bus)
+        # Served on every dashboard load; read it once up front.
+        self.index_html = (Path(__file__).parent / "index.html").read_bytes()
+        self._detached: set[socket.socket] = set()
+
+    def detach(self, request: socket.socket) -> None:
+        self._detached.add(request)
+        self.fanout.add(request)
+
+    def shutdown_request(self, request: socket.socket) -> None:  # type: ignore[override]
+        # Detached SSE sockets outlive their request; don't close them here.
+        if request in self._detached:
+            self._detached.discard(request)
+            return
+        super().shutdown_request(request)
+
+
 def main() -> int:
     default_log = (
         Path(__file__).resolve().parents[2] / "logs" / "warn.log"
@@ -281,8 +733,8 @@ def main() -> int:
     t = threading.Thread(target=tail_file, args=(log_path, bus, stop_evt), daemon=True)
     t.start()
 
-    httpd = ThreadingHTTPServer((args.host, args.port), Handler)
-    httpd.bus = bus  # type: ignore[attr-defined]
+    httpd = DashboardServer((args.host, args.port), bus)
+    threading.Thread(target=httpd.fanout.run, daemon=True).start()
 
     print(f"Anti-tampering dashboard: http://{args.host}:{args.port}")
     print(f"Tailing: {log_path}")
@@ -4,37 +4,64 @@ Generates scatter plots showing compression ratio vs speed trade-offs
 """
 
 import pandas as pd
+import matplotlib
+matplotlib.use('Agg')  # Files only, no GUI; must be set before pyplot is imported
 import matplotlib.pyplot as plt
 import matplotlib.ticker as ticker
 import numpy as np
 import sys
 import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+REQUIRED_COLUMNS = ['File', 'Config', 'Compression_Ratio', 'Write_Time_s', 'Read_Time_s']
+
+# Narrow, explicit dtypes: categoricals make the per-file/per-config filters
+# and groupbys compare integer codes instead of strings
+COLUMN_DTYPES = {
+    'File': 'category',
+    'Config': 'category',
+    'Compression_Ratio': 'float32',
+    'Write_Time_s': 'float32',
+    'Read_Time_s': 'float32'
+}
+
+def csv_engine():
+    """Use pyarrow's native CSV parser when available, else pandas' C parser"""
+    try:
+        import pyarrow  # noqa: F401
+        return 'pyarrow'
+    except ImportError:
+        return 'c'
+
 def load_results(csv_path):
     """Load benchmark results from CSV"""
     try:
-        df = pd.read_csv(csv_path)
-        required_columns = ['File', 'Config', 'Compression_Ratio', 'Write_Time_s', 'Read_Time_s']
-        if not all(col in df.columns for col in required_columns):
-            raise ValueError("Missing required columns")
-        return df
+        # usecols raises if any required column is missing
+        return pd.read_csv(csv_path, engine=csv_engine(),
+                           usecols=REQUIRED_COLUMNS, dtype=COLUMN_DTYPES)
     except Exception as e:
         print(f"Invalid CSV format: {e}")
         sys.exit(1)
 
-def create_scatter_plot(df, file_name, metric, output_dir):
+def reset_figure(ax, figsize):
+    """Clear the shared figure and restore the layout tight_layout() changed"""
+    fig = ax.figure
+    ax.cla()
+    fig.set_size_inches(*figsize)
+    fig.subplots_adjust(**{side: matplotlib.rcParams[f'figure.subplot.{side}']
+                           for side in ('left', 'right', 'bottom', 'top')})
+    return fig
+
+def create_scatter_plot(ax, file_data, file_name, metric, output_dir):
     """Create scatter plot for compression ratio vs execution time"""
     
-    # Filter data for specific file
-    file_data = df[df['File'] == file_name].copy()
-    
     if file_data.empty:
         print(f"No data found for file: {file_name}")
         return
     
-    # Set up the plot
-    plt.figure(figsize=(10, 6))
+    # Set up the plot, reusing the shared figure
+    fig = reset_figure(ax, (10, 6))
     
     # Define colors for different algorithm families
     colors = {
@@ -47,60 +74,58 @@ def create_scatter_plot(df, file_name, metric, output_dir):
         'zstd_high': '#2d7a73'
     }
     
-    # Plot points for each configuration
-    for _, row in file_data.iterrows():
-        config = row['Config']
-        ratio = row['Compression_Ratio']
-        execution_time = row[metric]  # Raw time in seconds
+    # Plot points for each configuration (one scatter call per config)
+    for config, config_data in file_data.groupby('Config', sort=False, observed=True):
+        ratios = config_data['Compression_Ratio'].to_numpy()
+        execution_times = config_data[metric].to_numpy()  # Raw time in seconds
         
         color = colors.get(config, '#000000')
-        plt.scatter(execution_time, ratio, 
+        ax.scatter(execution_times, ratios, 
                    c=color, s=80, alpha=0.8, 
                    label=config.replace('_', ' ').title(),
                    edgecolors='black', linewidth=0.5)
         
-        # Add config name near point
-        plt.annotate(config.replace('_', ' '), 
-                    (execution_time, ratio),
-                    xytext=(5, 5), textcoords='offset points',
-                    fontsize=8, alpha=0.7)
+        # Add config name near each point
+        for execution_time, ratio in zip(execution_times, ratios):
+            ax.annotate(config.replace('_', ' '), 
+                        (execution_time, ratio),
+                        xytext=(5, 5), textcoords='offset points',
+                        fontsize=8, alpha=0.7)
     
     # Customize plot
     operation = metric.replace('_Time_s', '').replace('_', ' ').title()
-    plt.xlabel(f'{operation} Execution Time (seconds)')
-    plt.ylabel('Compression Ratio')
-    plt.title(f'{file_name.title()} - Compression Ratio vs {operation} Time')
-    plt.grid(True, alpha=0.3)
+    ax.set_xlabel(f'{operation} Execution Time (seconds)')
+    ax.set_ylabel('Compression Ratio')
+    ax.set_title(f'{file_name.title()} - Compression Ratio vs {operation} Time')
+    ax.grid(True, alpha=0.3)
     
     # Set logarithmic scale for better visualization of time differences
     # plt.xscale('log')
 
     # Use StrMethodFormatter for automatic decimal formatting
     from matplotlib.ticker import StrMethodFormatter
-    plt.gca().xaxis.set_major_formatter(StrMethodFormatter('{x:.3f}s'))
+    ax.xaxis.set_major_formatter(StrMethodFormatter('{x:.3f}s'))
     
     # Remove duplicate labels
-    handles, labels = plt.gca().get_legend_handles_labels()
+    handles, labels = ax.get_legend_handles_labels()
     by_label = dict(zip(labels, handles))
-    plt.legend(by_label.values(), by_label.keys(), 
+    ax.legend(by_label.values(), by_label.keys(), 
               bbox_to_anchor=(1.05, 1), loc='upper left')
     
-    plt.tight_layout()
+    fig.tight_layout()
     
     # Save plot
     metric_name = metric.replace('_Time_s', '').replace('_', '_')
     output_file = output_dir / f'{file_name}_{metric_name}_time_vs_ratio.png'
-    plt.savefig(output_file, dpi=300, bbox_inches='tight')
-    plt.close()
+    fig.savefig(output_file, dpi=300, bbox_inches='tight')
     
     print(f"Created: {output_file}")
 
-def create_summary_plot(df, metric, output_dir):
+def create_summary_plot(ax, by_file, metric, output_dir):
     """Create summary plot with all files"""
-    plt.figure(figsize=(14, 8))
+    fig = reset_figure(ax, (14, 8))
     
-    files = df['File'].unique()
-    configs = df['Config'].unique()
+    files = list(by_file)
     
     # Colors for different files
     colors_by_file = plt.cm.Set3(np.linspace(0, 1, len(files)))
@@ -116,23 +141,19 @@ def create_summary_plot(df, metric, output_dir):
         'zstd_high': '*'
     }
     
-    # Plot each file-config combination
-    for i, file_name in enumerate(files):
-        file_data = df[df['File'] == file_name]
+    # Plot each file-config combination (one scatter call per pair)
+    for i, (file_name, file_data) in enumerate(by_file.items()):
+        color = colors_by_file[i]
         
-        for _, row in file_data.iterrows():
-            config = row['Config']
-            ratio = row['Compression_Ratio'] 
-            execution_time = row[metric]
-            
+        for j, (config, group) in enumerate(file_data.groupby('Config', sort=False, observed=True)):
             marker = markers.get(config, 'o')
-            color = colors_by_file[i]
             
-            plt.scatter(execution_time, ratio,
+            # Label only the first config of each file so the legend lists files once
+            ax.scatter(group[metric].to_numpy(), group['Compression_Ratio'].to_numpy(),
                        c=[color], s=80, alpha=0.8,
                        marker=marker,
                        edgecolors='black', linewidth=0.5,
-                       label=f"{file_name}" if config == list(file_data['Config'])[0] else "")
+                       label=f"{file_name}" if j == 0 else "")
     
     # Create custom legend for compression algorithms
     legend_elements = []
@@ -142,10 +163,10 @@ def create_summary_plot(df, metric, output_dir):
                                         label=config.replace('_', ' ').title()))
     
     operation = metric.replace('_Time_s', '').replace('_', ' ').title()
-    plt.xlabel(f'{operation} Execution Time (seconds)')
-    plt.ylabel('Compression Ratio')
-    plt.title(f'All Files - Compression Ratio vs {operation} Time')
-    plt.grid(True, alpha=0.3)
+    ax.set_xlabel(f'{operation} Execution Time (seconds)')
+    ax.set_ylabel('Compression Ratio')
+    ax.set_title(f'All Files - Compression Ratio vs {operation} Time')
+    ax.grid(True, alpha=0.3)
     
     # Customize x-axis ticks to show actual time values instead of scientific notation
     def time_formatter(x, pos):
@@ -156,23 +177,34 @@ def create_summary_plot(df, metric, output_dir):
         else:
             return f'{x:.1f}s'
 
-    plt.gca().xaxis.set_major_formatter(ticker.FuncFormatter(time_formatter))
+    ax.xaxis.set_major_formatter(ticker.FuncFormatter(time_formatter))
     
     # Create two legends: one for files (colors), one for algorithms (shapes)
-    file_legend = plt.legend(bbox_to_anchor=(1.02, 1), loc='upper left', title='Files')
-    algo_legend = plt.legend(handles=legend_elements, bbox_to_anchor=(1.02, 0.6), 
+    file_legend = ax.legend(bbox_to_anchor=(1.02, 1), loc='upper left', title='Files')
+    algo_legend = ax.legend(handles=legend_elements, bbox_to_anchor=(1.02, 0.6), 
                             loc='upper left', title='Algorithms')
-    plt.gca().add_artist(file_legend)  # Add back the file legend
+    ax.add_artist(file_legend)  # Add back the file legend
     
-    plt.tight_layout()
+    fig.tight_layout()
     
     metric_name = metric.replace('_Time_s', '').replace('_', '_')
     output_file = output_dir / f'all_files_{metric_name}_time_vs_ratio.png'
-    plt.savefig(output_file, dpi=300, bbox_inches='tight')
-    plt.close()
+    fig.savefig(output_file, dpi=300, bbox_inches='tight')
     
     print(f"Created: {output_file}")
 
+# Per-process figure reused by every plot job that runs in a worker
+_worker_ax = None
+
+def init_plot_worker():
+    """Create the worker's reusable figure once, when the process starts"""
+    global _worker_ax
+    _, _worker_ax = plt.subplots(figsize=(10, 6))
+
+def plot_file_job(file_data, file_name, metric, output_dir):
+    """Worker entry point: render one (file, metric) scatter plot"""
+    create_scatter_plot(_worker_ax, file_data, file_name, metric, output_dir)
+
 def main():
     if len(sys.argv) != 2:
         print("Usage: python3 plot_results.py <csv_file>")
@@ -191,21 +223,41 @@ def main():
     output_dir = csv_path.parent / 'plots'
     output_dir.mkdir(exist_ok=True)
     
-    # Get unique files
-    files = df['File'].unique()
+    # Split rows per file once; every plot below reuses these groups
+    by_file = {name: group for name, group in df.groupby('File', sort=False, observed=True)}
+    files = list(by_file)
     
     print(f"Creating plots for {len(files)} files...")
     
-    # Create individual file plots
-    for file_name in files:
-        print(f"\nProcessing {file_name}:")
-        create_scatter_plot(df, file_name, 'Write_Time_s', output_dir)
-        create_scatter_plot(df, file_name, 'Read_Time_s', output_dir)
+    # Individual file plots are independent; render them across processes.
+    # Each job only ships its own file's rows to the worker.
+    jobs = [(file_data, file_name, metric)
+            for file_name, file_data in by_file.items()
+            for metric in ('Write_Time_s', 'Read_Time_s')]
+    
+    print("\nCreating file plots:")
+    max_workers = min(len(jobs), os.cpu_count() or 1)
+    if max_workers <= 1:
+        # Not worth the process start-up cost; render in this process
+        init_plot_worker()
+        for file_data, file_name, metric in jobs:
+            plot_file_job(file_data, file_name, metric, output_dir)
+        plt.close(_worker_ax.figure)  # Done with it; don't hold it next to the summary figure
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers,
+                                 initializer=init_plot_worker) as executor:
+            futures = [executor.submit(plot_file_job, file_data, file_name, metric, output_dir)
+                       for file_data, file_name, metric in jobs]
+            for future in futures:
+                future.result()  # Re-raise any worker error here
     
-    # Create summary plots
+    # Create summary plots (on a figure reused for both)
     print(f"\nCreating summary plots:")
-    create_summary_plot(df, 'Write_Time_s', output_dir)
-    create_summary_plot(df, 'Read_Time_s', output_dir)
+    fig, ax = plt.subplots(figsize=(14, 8))
+    create_summary_plot(ax, by_file, 'Write_Time_s', output_dir)
+    create_summary_plot(ax, by_file, 'Read_Time_s', output_dir)
+    
+    plt.close(fig)
     
     print(f"\n✅ All plots saved to: {output_dir}")
     print(f"📊 Total plots created: {len(files) * 2 + 2}")